@@ -4,16 +4,39 @@ Python配置管理器
 用于验证和管理PDF合并相关配置
 """
 
+import functools
 import os
 import json
 import logging
 from typing import Dict, Any, Optional, List
 from urllib.parse import urlparse
 
+try:
+    import orjson
+except ImportError:
+    # orjson不可用时回退到标准库json，仅损失解析速度
+    orjson = None
+
 class ConfigValidationError(Exception):
     """配置验证异常"""
     pass
 
+# get缓存中区分"键不存在"和"值为None"的哨兵
+_MISSING = object()
+
+@functools.lru_cache(maxsize=32)
+def _load_raw_config(path: str, mtime_ns: int, size: int) -> Dict[str, Any]:
+    """
+    读取并缓存config.json的原始解析结果
+
+    mtime和大小参与缓存键，文件改动后自动失效。同一进程内反复构造
+    ConfigManager（批量合并、重复校验）时跳过重复的open+解析；
+    合并默认值时会为各嵌套节建新dict，缓存对象不会被后续步骤改写。
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
 class ConfigManager:
     """
     配置管理器类
@@ -67,10 +90,10 @@ class ConfigManager:
         'imageTimeout': int,
         'logLevel': str,
         'navLinksSelector': str,
-        'contentSelector': str,
-        'ignoreURLs': list,
-        'allowedDomains': list,
-        'sectionEntryPoints': list
+        'contentSelector': str,
+        'ignoreURLs': list,
+        'allowedDomains': list,
+        'sectionEntryPoints': list
     }
     
     def __init__(self, config_path: str = 'config.json', logger: Optional[logging.Logger] = None):
@@ -85,6 +108,8 @@ class ConfigManager:
         self.logger = logger or self._setup_logger()
         self._config = None
         self._validated = False
+        self._get_cache = {}
+        self._pdf_config = None
         
     def _setup_logger(self) -> logging.Logger:
         """设置默认日志记录器"""
@@ -110,13 +135,16 @@ class ConfigManager:
             ConfigValidationError: 配置加载或验证失败
         """
         try:
-            # 检查文件是否存在
-            if not os.path.exists(self.config_path):
+            # 检查文件是否存在（stat结果同时作为解析缓存的键）
+            try:
+                st = os.stat(self.config_path)
+            except OSError:
                 raise ConfigValidationError(f"配置文件不存在: {self.config_path}")
-            
-            # 读取配置文件
-            with open(self.config_path, 'r', encoding='utf-8') as f:
-                raw_config = json.load(f)
+
+            # 读取配置文件（命中缓存时跳过open+解析）
+            raw_config = _load_raw_config(
+                self.config_path, st.st_mtime_ns, st.st_size
+            )
             
             # 合并默认配置
             self._config = self._merge_with_defaults(raw_config)
@@ -131,6 +159,8 @@ class ConfigManager:
             self._normalize_paths()
             
             self._validated = True
+            self._get_cache.clear()
+            self._pdf_config = None
             self.logger.info(f"配置加载成功: {self.config_path}")
             
             return self._config
@@ -150,17 +180,19 @@ class ConfigManager:
         Returns:
             合并后的配置
         """
-        def deep_merge(default: Dict, user: Dict) -> Dict:
-            """深度合并字典"""
-            result = default.copy()
-            for key, value in user.items():
-                if key in result and isinstance(result[key], dict) and isinstance(value, dict):
-                    result[key] = deep_merge(result[key], value)
-                else:
-                    result[key] = value
-            return result
-        
-        return deep_merge(self.DEFAULT_CONFIG, user_config)
+        # 默认配置只有三个嵌套节（metadata/output/pdf），逐节浅合并即可，
+        # 避免通用递归合并在每个子进程加载配置时的逐层dict拷贝
+        merged = {**self.DEFAULT_CONFIG, **user_config}
+
+        for section in ('metadata', 'output', 'pdf'):
+            user_section = user_config.get(section)
+            if isinstance(user_section, dict):
+                merged[section] = {**self.DEFAULT_CONFIG[section], **user_section}
+            elif section not in user_config:
+                # 复制默认节，避免后续路径规范化改写类级别的DEFAULT_CONFIG
+                merged[section] = dict(self.DEFAULT_CONFIG[section])
+
+        return merged
     
     def _validate_config(self) -> None:
         """
@@ -187,9 +219,9 @@ class ConfigManager:
                         f"实际 {type(value).__name__}"
                     )
         
-        # 验证URL格式
-        self._validate_url(self._config['rootURL'])
-        self._validate_section_entry_points()
+        # 验证URL格式
+        self._validate_url(self._config['rootURL'])
+        self._validate_section_entry_points()
         
         # 验证数字范围
         self._validate_numeric_ranges()
@@ -250,30 +282,30 @@ class ConfigManager:
                 if not selector or not isinstance(selector, str):
                     raise ConfigValidationError(f"无效的选择器: {key}")
     
-    def _validate_domains(self) -> None:
-        """验证域名配置"""
-        if 'allowedDomains' in self._config:
-            domains = self._config['allowedDomains']
-            if not isinstance(domains, list):
-                raise ConfigValidationError("allowedDomains 必须是数组")
-            
-            for domain in domains:
-                if not isinstance(domain, str) or not domain.strip():
-                    raise ConfigValidationError(f"无效的域名: {domain}")
-    
-    def _validate_section_entry_points(self) -> None:
-        """验证额外章节入口URL"""
-        entries = self._config.get('sectionEntryPoints')
-        if entries is None:
-            return
-        
-        if not isinstance(entries, list):
-            raise ConfigValidationError("sectionEntryPoints 必须是数组")
-        
-        for entry in entries:
-            if not isinstance(entry, str) or not entry.strip():
-                raise ConfigValidationError(f"无效的章节入口: {entry}")
-            self._validate_url(entry)
+    def _validate_domains(self) -> None:
+        """验证域名配置"""
+        if 'allowedDomains' in self._config:
+            domains = self._config['allowedDomains']
+            if not isinstance(domains, list):
+                raise ConfigValidationError("allowedDomains 必须是数组")
+            
+            for domain in domains:
+                if not isinstance(domain, str) or not domain.strip():
+                    raise ConfigValidationError(f"无效的域名: {domain}")
+    
+    def _validate_section_entry_points(self) -> None:
+        """验证额外章节入口URL"""
+        entries = self._config.get('sectionEntryPoints')
+        if entries is None:
+            return
+        
+        if not isinstance(entries, list):
+            raise ConfigValidationError("sectionEntryPoints 必须是数组")
+        
+        for entry in entries:
+            if not isinstance(entry, str) or not entry.strip():
+                raise ConfigValidationError(f"无效的章节入口: {entry}")
+            self._validate_url(entry)
     
     def _process_environment_variables(self) -> None:
         """处理环境变量替换"""
@@ -337,17 +369,20 @@ class ConfigManager:
         
         if key is None:
             return self._config
-        
-        # 支持嵌套键访问
-        keys = key.split('.')
-        value = self._config
-        
-        try:
-            for k in keys:
-                value = value[k]
-            return value
-        except (KeyError, TypeError):
-            return default
+
+        # 点号路径查找结果缓存（load()后配置不再变化，缺失键缓存哨兵）
+        value = self._get_cache.get(key, _MISSING)
+        if value is _MISSING and key not in self._get_cache:
+            # 支持嵌套键访问
+            value = self._config
+            try:
+                for k in key.split('.'):
+                    value = value[k]
+            except (KeyError, TypeError):
+                value = _MISSING
+            self._get_cache[key] = value
+
+        return default if value is _MISSING else value
     
     def get_pdf_config(self) -> Dict[str, Any]:
         """
@@ -356,7 +391,11 @@ class ConfigManager:
         Returns:
             PDF配置字典
         """
-        return {
+        # 结果在load()后固定，计算一次后复用
+        if self._pdf_config is not None:
+            return self._pdf_config
+
+        self._pdf_config = {
             'pdf_dir': self.get('pdfDir'),
             'final_pdf_dir': os.path.join(
                 self.get('pdfDir'), 
@@ -375,7 +414,8 @@ class ConfigManager:
             'bookmarks': self.get('pdf.bookmarks', True),
             'quality': self.get('pdf.quality', 'high')
         }
-    
+        return self._pdf_config
+
     def validate_paths(self) -> List[str]:
         """
         验证路径是否存在，返回需要创建的路径列表
@@ -400,12 +440,19 @@ class ConfigManager:
     
     def create_missing_directories(self) -> None:
         """创建缺失的目录"""
-        missing_paths = self.validate_paths()
-        
-        for path in missing_paths:
+        # 直接makedirs(exist_ok=True)，不做exists预检：
+        # 少一次stat，且并行工作进程同时创建时没有TOCTOU竞争窗口
+        pdf_config = self.get_pdf_config()
+        paths = (
+            pdf_config['pdf_dir'],
+            pdf_config['final_pdf_dir'],
+            pdf_config['metadata_dir'],
+            pdf_config['temp_dir']
+        )
+
+        for path in paths:
             try:
                 os.makedirs(path, exist_ok=True)
-                self.logger.info(f"创建目录: {path}")
             except Exception as e:
                 self.logger.error(f"创建目录失败 {path}: {e}")
                 raise ConfigValidationError(f"创建目录失败: {path}")
@@ -499,4 +546,4 @@ if __name__ == '__main__':
             print(f"📁 需要创建的目录: {', '.join(result['missing_paths'])}")
     else:
         print(f"❌ {result['message']}: {result['error']}")
-        sys.exit(1)
+        sys.exit(1)
@@ -1,912 +1,1166 @@
-#!/usr/bin/env python3
-"""
-优化的PDF合并服务类 - 修复文件排序支持数字索引
-"""
-
-import os
-import sys
-import json
-import logging
-import fitz  # PyMuPDF
-from datetime import datetime
-from urllib.parse import urlparse
-from typing import Dict, List, Optional, Callable, Any
-import gc
-import psutil
-import time
-import traceback
-
-class PDFMergerError(Exception):
-    """PDF合并相关异常"""
-    pass
-
-class ConfigurationError(PDFMergerError):
-    """配置错误异常"""
-    pass
-
-class FileProcessingError(PDFMergerError):
-    """文件处理异常"""
-    pass
-
-class PDFMerger:
-    """
-    企业级PDF合并服务类 - 智能排序版本
-
-    特性：
-    - 智能文件排序（支持数字索引和哈希前缀）
-    - 流式处理，避免内存溢出
-    - 完整的错误处理和恢复机制
-    - 进度跟踪和性能监控
-    """
-
-    def __init__(self, config_path: str = 'config.json', logger: Optional[logging.Logger] = None):
-        """
-        初始化PDF合并器
-
-        Args:
-            config_path: 配置文件路径
-            logger: 可选的日志记录器
-        """
-        self.config_path = config_path
-        self.logger = logger or self._setup_logger()
-
-        # 加载配置
-        self.config = self._load_config(config_path)
-
-        # 设置路径
-        self.pdf_dir = self.config['pdfDir']
-        self.metadata_dir = os.path.join(
-            self.pdf_dir,
-            self.config.get('metadata', {}).get('directory', 'metadata')
-        )
-        self.final_pdf_dir = os.path.join(
-            self.pdf_dir,
-            self.config.get('output', {}).get('finalPdfDirectory', 'finalPdf')
-        )
-
-        # 性能监控
-        self.stats = {
-            'files_processed': 0,
-            'total_pages': 0,
-            'start_time': None,
-            'memory_peak': 0,
-            'errors': []
-        }
-
-        # 加载文章标题
-        self.article_titles = self._load_article_titles()
-
-        # 加载section结构（用于分层TOC）
-        self.section_structure = self._load_section_structure()
-
-    def _setup_logger(self) -> logging.Logger:
-        """设置默认日志记录器"""
-        logger = logging.getLogger('PDFMerger')
-        if not logger.handlers:
-            formatter = logging.Formatter(
-                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-            )
-
-            # Console handler (stderr)
-            console_handler = logging.StreamHandler()
-            console_handler.setFormatter(formatter)
-            logger.addHandler(console_handler)
-
-            # File handler (logs/python_pdf_merger.log)
-            try:
-                log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
-                os.makedirs(log_dir, exist_ok=True)
-                log_file = os.path.join(log_dir, 'python_pdf_merger.log')
-                file_handler = logging.FileHandler(log_file, encoding='utf-8')
-                file_handler.setFormatter(formatter)
-                logger.addHandler(file_handler)
-            except Exception as e:
-                # If file handler fails, continue with console only
-                logger.warning(f"无法创建文件日志处理器: {e}")
-
-            logger.setLevel(logging.WARNING)  # Only show warnings and errors
-        return logger
-
-    def _load_config(self, config_path: str) -> Dict[str, Any]:
-        """加载配置文件"""
-        try:
-            if not os.path.exists(config_path):
-                raise ConfigurationError(f"配置文件不存在: {config_path}")
-
-            with open(config_path, 'r', encoding='utf-8') as f:
-                config = json.load(f)
-
-            # 验证必需的配置项
-            required_keys = ['rootURL', 'pdfDir']
-            for key in required_keys:
-                if key not in config:
-                    raise ConfigurationError(f"缺少必需的配置项: {key}")
-
-            return config
-
-        except json.JSONDecodeError as e:
-            raise ConfigurationError(f"配置文件JSON格式错误: {e}")
-        except Exception as e:
-            raise ConfigurationError(f"配置加载失败: {e}")
-
-    def _load_article_titles(self) -> Dict[str, str]:
-        """加载文章标题映射"""
-        article_titles = {}
-
-        try:
-            # 尝试从元数据目录加载
-            metadata_file = os.path.join(self.metadata_dir, 'articleTitles.json')
-            if os.path.exists(metadata_file):
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    article_titles = json.load(f)
-                    pass  # Loaded article titles from metadata
-
-            # 回退到PDF目录
-            if not article_titles:
-                fallback_file = os.path.join(self.pdf_dir, 'articleTitles.json')
-                if os.path.exists(fallback_file):
-                    with open(fallback_file, 'r', encoding='utf-8') as f:
-                        article_titles = json.load(f)
-                        pass  # Loaded article titles from PDF directory
-
-        except Exception as e:
-            self.logger.warning(f"加载文章标题失败: {e}")
-
-        return article_titles
-
-    def _load_section_structure(self) -> Optional[Dict[str, Any]]:
-        """加载section结构信息（用于分层TOC）"""
-        section_structure = None
-
-        try:
-            # 尝试从元数据目录加载
-            metadata_file = os.path.join(self.metadata_dir, 'sectionStructure.json')
-            if os.path.exists(metadata_file):
-                with open(metadata_file, 'r', encoding='utf-8') as f:
-                    section_structure = json.load(f)
-                    self.logger.info(f"已加载section结构: {len(section_structure.get('sections', []))} sections")
-                    return section_structure
-
-            # 回退到PDF目录
-            fallback_file = os.path.join(self.pdf_dir, 'sectionStructure.json')
-            if os.path.exists(fallback_file):
-                with open(fallback_file, 'r', encoding='utf-8') as f:
-                    section_structure = json.load(f)
-                    self.logger.info(f"已加载section结构（从PDF目录）: {len(section_structure.get('sections', []))} sections")
-                    return section_structure
-
-        except Exception as e:
-            self.logger.debug(f"加载section结构失败（将使用flat TOC）: {e}")
-
-        return section_structure
-
-    def _validate_article_titles(self, pdf_file_count: int) -> bool:
-        """
-        验证 articleTitles.json 是否有效
-
-        Args:
-            pdf_file_count: PDF文件数量（用于比较）
-
-        Returns:
-            bool: 是否有效
-        """
-        if not self.article_titles:
-            self.logger.warning(
-                "⚠️  articleTitles.json 为空或不存在！\n"
-                "    PDF 目录将显示文件名（如 'Page 0', 'Page 1'）而非实际标题。\n"
-                "    可能原因：\n"
-                "      1. 标题提取失败（检查 contentSelector 配置）\n"
-                "      2. 页面加载不完整（检查 navigationWaitUntil 配置）\n"
-                "      3. 页面缺少标题元素（<title> 或 h1-h3）\n"
-                "    建议：重新运行爬取并检查日志中的标题提取警告"
-            )
-            return False
-
-        # 检查标题数量是否合理
-        title_count = len(self.article_titles)
-        if title_count < pdf_file_count * 0.5:
-            self.logger.warning(
-                f"⚠️  标题数量 ({title_count}) 远少于 PDF 文件数量 ({pdf_file_count})！\n"
-                f"    约 {pdf_file_count - title_count} 个页面的标题提取失败。\n"
-                f"    建议：检查爬取日志中的标题提取警告"
-            )
-            return False
-
-        self.logger.info(f"✓ articleTitles 验证通过: {title_count} 个标题")
-        return True
-
-    def _get_pdf_files(self, directory_path: str, engine_filter: str = None) -> List[str]:
-        """
-        获取目录中的PDF文件列表（智能排序）
-
-        支持：
-        1. 数字前缀文件（000-xxx.pdf, 001-xxx.pdf）- 按数字排序
-        2. 哈希前缀文件（676cb9dd-xxx.pdf）- 按文件创建时间排序
-        3. 混合情况 - 数字文件优先，然后哈希文件
-        4. 引擎过滤：只获取特定引擎生成的PDF文件
-
-        Args:
-            directory_path: 目录路径
-            engine_filter: 引擎过滤器，可选值：'puppeteer', None(所有文件)
-        """
-        try:
-            if not os.path.exists(directory_path):
-                return []
-
-            all_files = os.listdir(directory_path)
-            self.logger.debug(f"目录 {directory_path} 中的所有文件: {all_files}")
-
-            files = [
-                f for f in all_files
-                if f.endswith('.pdf') and os.path.isfile(os.path.join(directory_path, f))
-            ]
-
-            # 根据引擎过滤PDF文件
-            if engine_filter:
-                if engine_filter == 'puppeteer':
-                    # 只要包含_puppeteer的文件
-                    files = [f for f in files if '_puppeteer.pdf' in f]
-                elif engine_filter == 'single':
-                    # 只要不包含_puppeteer的文件（单引擎模式的文件）
-                    files = [f for f in files if '_puppeteer.pdf' not in f]
-
-            if not files:
-                return []
-
-            self.logger.debug(f"过滤后的PDF文件 (engine_filter={engine_filter}): {files}")
-
-            # 🔥 智能排序逻辑：支持数字前缀和哈希前缀
-            def get_sort_key(filename: str) -> tuple:
-                try:
-                    # 对于双引擎文件，需要去掉_puppeteer后缀来获取前缀
-                    name_for_sorting = filename
-                    if '_puppeteer.pdf' in filename:
-                        name_for_sorting = filename.replace('_puppeteer.pdf', '.pdf')
-
-                    parts = name_for_sorting.split('-', 1)  # 只分割第一个连字符
-                    if len(parts) == 0:
-                        return (999999, 0, filename)
-
-                    prefix = parts[0]
-
-                    # 检查是否为数字前缀（包括补零的情况）
-                    if prefix.isdigit():
-                        # 数字前缀，按数字大小排序，优先级最高
-                        return (0, int(prefix), filename)
-
-                    # 检查是否为补零的数字前缀（如 001, 002）
-                    try:
-                        # 去掉前导零，但保留至少一个0
-                        num = int(prefix.lstrip('0') or '0')
-                        if prefix.startswith('0') and len(prefix) > 1:
-                            # 这是补零的数字，优先级最高
-                            return (0, num, filename)
-                    except ValueError:
-                        pass
-
-                    # 检查是否为哈希前缀（8位十六进制）
-                    if len(prefix) == 8 and all(c in '0123456789abcdef' for c in prefix.lower()):
-                        # 哈希前缀，按文件创建时间排序，优先级次高
-                        try:
-                            file_path = os.path.join(directory_path, filename)
-                            mtime = os.path.getmtime(file_path)
-                            return (1, mtime, filename)
-                        except:
-                            return (1, 0, filename)
-
-                    # 其他情况，按文件名字母排序，优先级最低
-                    return (2, 0, filename)
-
-                except Exception as e:
-                    self.logger.debug(f"排序键生成失败 {filename}: {e}")
-                    return (999999, 0, filename)
-
-            # 按排序键排序
-            files.sort(key=get_sort_key)
-
-            # 统计不同类型的文件
-            numeric_files = []
-            hash_files = []
-            other_files = []
-
-            for f in files:
-                # 对于双引擎文件，需要去掉引擎后缀来获取前缀
-                name_for_analysis = f
-                if '_puppeteer.pdf' in f:
-                    name_for_analysis = f.replace('_puppeteer.pdf', '.pdf')
-
-                prefix = name_for_analysis.split('-')[0] if '-' in name_for_analysis else ''
-                if prefix.isdigit() or (prefix.startswith('0') and prefix.isdigit()):
-                    numeric_files.append(f)
-                elif len(prefix) == 8 and all(c in '0123456789abcdef' for c in prefix.lower()):
-                    hash_files.append(f)
-                else:
-                    other_files.append(f)
-
-            # Only log if there are significant numbers of files
-            if len(files) > 10:
-                engine_info = f" ({engine_filter} engine)" if engine_filter else ""
-                self.logger.info(f"Found {len(files)} PDF files in {directory_path}{engine_info}")
-
-            self.logger.debug(f"排序后文件列表前5个: {files[:5]}")
-            return files
-
-        except Exception as e:
-            self.logger.error(f"获取PDF文件列表失败: {e}")
-            self.logger.error(f"错误详情: {traceback.format_exc()}")
-            return []
-
-    def _create_bookmark_title(self, filename: str, article_titles: Dict[str, str]) -> str:
-        """
-        创建书签标题（改进版）
-        
-        🔧 修复：正确处理引擎后缀，避免标题中出现"Puppeteer"
-
-        优先级：
-        1. 文章标题映射
-        2. 清理后的文件名（移除引擎后缀）
-        
-        支持的文件名格式：
-        - 001-page-name.pdf → "Page Name"
-        - 001-page-name_puppeteer.pdf → "Page Name" (移除引擎后缀)
-        - 001-page-name_puppeteer.pdf → "Page Name" (移除引擎后缀)
-        """
-        try:
-            self.logger.debug(f"为文件创建书签标题: {filename}")
-
-            # 🔥 首先移除引擎后缀（_puppeteer）
-            cleaned_filename = filename
-            if '_puppeteer.pdf' in filename:
-                cleaned_filename = filename.replace('_puppeteer.pdf', '.pdf')
-                self.logger.debug(f"移除Puppeteer引擎后缀: {filename} -> {cleaned_filename}")
-
-            # 提取前缀和文件名部分
-            parts = cleaned_filename.split('-', 1)  # 只分割第一个连字符
-            if len(parts) < 2:
-                title = os.path.splitext(cleaned_filename)[0]
-                self.logger.debug(f"无前缀文件，使用文件名作为标题: {title}")
-                return title
-
-            prefix = parts[0]
-            name_part = parts[1]
-
-            # 🔥 尝试从文章标题映射中查找
-            # 支持数字前缀（包括补零）和原始前缀
-            possible_keys = [prefix]
-
-            # 如果是数字前缀，添加多种可能的键格式
-            if prefix.isdigit():
-                num = int(prefix)
-                possible_keys.extend([
-                    str(num),                    # 去掉前导零: "1"
-                    str(num).zfill(3),          # 3位补零: "001"
-                    str(num).zfill(2)           # 2位补零: "01"
-                ])
-
-            # 查找标题映射
-            for key in possible_keys:
-                if key in article_titles:
-                    title = article_titles[key]
-                    self.logger.debug(f"找到文章标题映射 {key}: {title}")
-                    return title
-
-            # 如果没找到映射，使用清理后的文件名
-            cleaned_name = os.path.splitext(name_part)[0]
-            # 将连字符和下划线替换为空格，使用标题格式
-            title = cleaned_name.replace('-', ' ').replace('_', ' ')
-            # 转换为标题格式：每个单词首字母大写
-            title = ' '.join(word.capitalize() for word in title.split())
-
-            self.logger.debug(f"使用清理后的文件名作为标题: {title}")
-            return title
-
-        except Exception as e:
-            self.logger.warning(f"创建书签标题失败 {filename}: {e}")
-            return os.path.splitext(filename)[0]
-
-    def _build_hierarchical_toc(
-        self,
-        files: List[str],
-        page_counts: Dict[str, int],
-        file_to_index: Dict[str, str]
-    ) -> List[List[Any]]:
-        """
-        构建分层TOC结构
-
-        Args:
-            files: PDF文件名列表（按合并顺序）
-            page_counts: 文件名 -> 页数映射
-            file_to_index: 文件名 -> 索引映射
-
-        Returns:
-            分层TOC列表 [[level, title, page, link], ...]
-        """
-        toc = []
-
-        if not self.section_structure or 'sections' not in self.section_structure:
-            # Fallback到flat TOC
-            self.logger.debug("没有section结构，使用flat TOC")
-            return None
-
-        sections = self.section_structure['sections']
-        current_page = 0
-
-        # 构建文件名到页数的映射
-        file_page_map = {}  # filename -> start_page
-        for filename in files:
-            file_page_map[filename] = current_page
-            current_page += page_counts.get(filename, 0)
-
-        # 🔥 性能优化：预先构建反向索引 (index -> filename) 以避免O(n²)嵌套循环
-        index_to_file = {}  # index -> filename
-        for filename in files:
-            file_index = file_to_index.get(filename)
-            if file_index:
-                index_to_file[file_index] = filename
-
-        self.logger.debug(f"构建索引映射: {len(index_to_file)} 个文件")
-
-        # 遍历每个section
-        for section in sections:
-            section_title = section.get('title', 'Untitled Section')
-            section_pages = section.get('pages', [])
-
-            if not section_pages:
-                # 跳过空section
-                continue
-
-            # 找到该section的第一个有效页面作为section链接目标
-            section_start_page = None
-            valid_pages = []
-
-            for page_info in section_pages:
-                page_index = page_info.get('index')
-                if not page_index:
-                    continue
-
-                # 🔥 O(1) 查找而不是O(n)嵌套循环
-                found_file = index_to_file.get(page_index)
-
-                if found_file and found_file in file_page_map:
-                    page_start = file_page_map[found_file]
-                    page_title = self.article_titles.get(page_index, f"Page {page_index}")
-
-                    if section_start_page is None:
-                        section_start_page = page_start
-
-                    valid_pages.append({
-                        'title': page_title,
-                        'page': page_start,
-                        'index': page_index
-                    })
-
-            # 如果该section有有效页面，添加到TOC
-            if valid_pages:
-                # 添加section标题（level 1）
-                toc.append([
-                    1,  # Level 1: Section
-                    section_title,
-                    section_start_page + 1,  # PyMuPDF页码从1开始
-                    {"kind": 1, "page": section_start_page}
-                ])
-
-                # 添加该section下的页面（level 2）
-                for page in valid_pages:
-                    toc.append([
-                        2,  # Level 2: Page
-                        page['title'],
-                        page['page'] + 1,
-                        {"kind": 1, "page": page['page']}
-                    ])
-
-        self.logger.info(f"构建了分层TOC: {len([t for t in toc if t[0] == 1])} sections, {len([t for t in toc if t[0] == 2])} pages")
-        return toc
-
-    def _monitor_memory(self) -> None:
-        """监控内存使用情况"""
-        try:
-            process = psutil.Process()
-            memory_mb = process.memory_info().rss / 1024 / 1024
-            self.stats['memory_peak'] = max(self.stats['memory_peak'], memory_mb)
-
-            # 如果内存使用超过阈值，强制垃圾回收
-            if memory_mb > 500:  # 500MB阈值
-                gc.collect()
-                self.logger.debug(f"内存使用: {memory_mb:.1f}MB, 已执行垃圾回收")
-        except Exception:
-            pass  # 内存监控失败不应影响主流程
-
-    def _generate_friendly_filename(self, directory_name: str, current_date: str) -> str:
-        """
-        生成用户友好的PDF文件名
-        
-        转换规则：
-        - docs.anthropic.com-docs -> Claude-Code-Docs
-        - github.com-docs -> GitHub-Docs  
-        - example.com-api -> Example-API
-        """
-        try:
-            # 移除常见的域名后缀和前缀
-            clean_name = directory_name
-            
-            # 处理 docs.anthropic.com-docs 格式
-            if 'anthropic.com' in clean_name:
-                clean_name = 'Claude-Code-Docs'
-            elif 'github.com' in clean_name:
-                clean_name = 'GitHub-Docs'
-            else:
-                # 通用处理：移除域名部分，只保留内容类型
-                if '-' in clean_name:
-                    parts = clean_name.split('-')
-                    # 取最后一部分作为内容类型
-                    content_type = parts[-1]
-                    if '.' in parts[0]:
-                        # 提取域名的主要部分
-                        domain_parts = parts[0].split('.')
-                        main_domain = domain_parts[-2] if len(domain_parts) > 1 else domain_parts[0]
-                        clean_name = f"{main_domain.title()}-{content_type.title()}"
-                    else:
-                        clean_name = content_type.title()
-                else:
-                    clean_name = clean_name.replace('.', '-').title()
-            
-            return f"{clean_name}_{current_date}.pdf"
-            
-        except Exception as e:
-            self.logger.warning(f"文件名优化失败，使用原始名称: {e}")
-            return f"{directory_name}_{current_date}.pdf"
-
-    def merge_pdfs_stream(
-        self,
-        directory_path: str,
-        output_path: str,
-        progress_callback: Optional[Callable[[int, int], None]] = None,
-        engine_filter: str = None
-    ) -> bool:
-        """流式合并PDF文件"""
-        try:
-            files = self._get_pdf_files(directory_path, engine_filter)
-            if not files:
-                return False
-
-            # 验证 articleTitles.json
-            self._validate_article_titles(len(files))
-
-            merged_pdf = None
-            current_file_pdf = None
-
-            try:
-                # 确保输出目录存在
-                os.makedirs(os.path.dirname(output_path), exist_ok=True)
-
-                merged_pdf = fitz.open()  # 创建空的PDF文档
-                toc = []  # 目录结构
-
-                # 🔥 新增：收集信息用于构建分层TOC
-                page_counts = {}  # filename -> page_count
-                file_to_index = {}  # filename -> index (用于匹配sectionStructure)
-
-                # Starting merge operation (logging reduced for cleaner output)
-
-                for i, filename in enumerate(files):
-                    try:
-                        self.logger.debug(f"处理文件 {i+1}/{len(files)}: {filename}")
-                        file_path = os.path.join(directory_path, filename)
-
-                        # 检查文件是否存在
-                        if not os.path.exists(file_path):
-                            self.logger.error(f"文件不存在: {file_path}")
-                            continue
-
-                        # 打开当前PDF文件
-                        current_file_pdf = fitz.open(file_path)
-                        page_count = current_file_pdf.page_count
-
-                        if page_count == 0:
-                            self.logger.warning(f"跳过空PDF文件: {filename}")
-                            current_file_pdf.close()
-                            continue
-
-                        # 记录合并前的页数
-                        start_page = merged_pdf.page_count
-
-                        # 插入PDF页面
-                        merged_pdf.insert_pdf(current_file_pdf)
-
-                        # 🔥 新增：记录信息用于分层TOC
-                        page_counts[filename] = page_count
-
-                        # 从文件名提取索引（支持 001-xxx.pdf 和 001-xxx_puppeteer.pdf）
-                        cleaned_filename = filename
-                        if '_puppeteer.pdf' in filename:
-                            cleaned_filename = filename.replace('_puppeteer.pdf', '.pdf')
-
-                        prefix = cleaned_filename.split('-')[0] if '-' in cleaned_filename else ''
-                        if prefix.isdigit():
-                            # 移除前导零以匹配scraper生成的索引格式
-                            # "001" → "1", "000" → "0"
-                            file_to_index[filename] = str(int(prefix))
-
-                        # 创建书签（用于flat TOC fallback）
-                        bookmark_title = self._create_bookmark_title(filename, self.article_titles)
-                        toc.append([
-                            1,  # 级别
-                            bookmark_title,  # 标题
-                            start_page + 1,  # 页码（从1开始）
-                            {"kind": 1, "page": start_page}  # 链接信息
-                        ])
-
-                        # 关闭当前文件
-                        current_file_pdf.close()
-                        current_file_pdf = None
-
-                        # 更新统计
-                        self.stats['files_processed'] += 1
-                        self.stats['total_pages'] += page_count
-
-                        # 内存监控
-                        self._monitor_memory()
-
-                        # 进度回调
-                        if progress_callback:
-                            progress_callback(i + 1, len(files))
-
-                        self.logger.debug(f"已合并: {filename} ({page_count} 页) -> 书签: {bookmark_title}")
-
-                    except Exception as e:
-                        error_msg = f"处理文件失败 {filename}: {e}"
-                        self.logger.error(error_msg)
-                        self.logger.error(f"错误详情: {traceback.format_exc()}")
-                        self.stats['errors'].append(error_msg)
-
-                        if current_file_pdf:
-                            current_file_pdf.close()
-                            current_file_pdf = None
-
-                        # 继续处理下一个文件
-                        continue
-
-                # 🔥 新增：尝试构建分层TOC
-                hierarchical_toc = None
-                if self.section_structure:
-                    try:
-                        hierarchical_toc = self._build_hierarchical_toc(files, page_counts, file_to_index)
-                        if hierarchical_toc:
-                            self.logger.info(f"使用分层TOC结构")
-                            toc = hierarchical_toc
-                        else:
-                            self.logger.info(f"使用flat TOC结构（无section信息）")
-                    except Exception as e:
-                        self.logger.warning(f"构建分层TOC失败，使用flat TOC: {e}")
-                        # toc已经包含flat结构，无需修改
-
-                # 设置目录结构（如果启用了书签功能）
-                bookmarks_enabled = self.config.get('pdf', {}).get('bookmarks', True)
-                if bookmarks_enabled and toc:
-                    merged_pdf.set_toc(toc)
-                    self.logger.info(f"已创建PDF目录，包含 {len(toc)} 个书签")
-                elif not bookmarks_enabled:
-                    self.logger.info("书签功能已禁用，跳过目录创建")
-
-                # 保存合并后的PDF
-                merged_pdf.save(output_path)
-
-                return True
-
-            except Exception as e:
-                error_msg = f"PDF合并失败: {e}"
-                self.logger.error(error_msg)
-                self.logger.error(f"错误详情: {traceback.format_exc()}")
-                self.stats['errors'].append(error_msg)
-                raise FileProcessingError(error_msg)
-
-            finally:
-                # 清理资源
-                if current_file_pdf:
-                    current_file_pdf.close()
-                if merged_pdf:
-                    merged_pdf.close()
-
-                # 强制垃圾回收
-                gc.collect()
-
-        except Exception as e:
-            self.logger.error(f"merge_pdfs_stream 执行失败: {e}")
-            self.logger.error(f"错误详情: {traceback.format_exc()}")
-            return False
-
-    def _detect_dual_engine_mode(self, directory_path: str) -> bool:
-        """检测是否为双引擎模式（已弃用，现在只支持Puppeteer）"""
-        # 双引擎模式已移除，始终返回False
-        return False
-
-    def merge_directory(self, directory_name: Optional[str] = None) -> List[str]:
-        """合并指定目录或所有子目录的PDF文件"""
-        try:
-            if not os.path.exists(self.pdf_dir):
-                raise FileProcessingError(f"PDF目录不存在: {self.pdf_dir}")
-
-            # 确保输出目录存在
-            os.makedirs(self.final_pdf_dir, exist_ok=True)
-
-            # 获取域名和时间戳（包含秒）
-            url = urlparse(self.config['rootURL'])
-            domain = url.hostname.replace('.', '_') if url.hostname else 'unknown'
-            current_date = datetime.now().strftime('%Y%m%d_%H%M%S')
-
-            merged_files = []
-
-            if directory_name:
-                # 合并指定目录
-                directory_path = os.path.join(self.pdf_dir, directory_name)
-                if os.path.isdir(directory_path):
-                    # 单引擎模式：正常合并
-                    friendly_filename = self._generate_friendly_filename(directory_name, current_date)
-                    output_path = os.path.join(
-                        self.final_pdf_dir,
-                        friendly_filename
-                    )
-                    if self.merge_pdfs_stream(directory_path, output_path):
-                        merged_files.append(output_path)
-                else:
-                    self.logger.warning(f"指定目录不存在: {directory_path}")
-            else:
-                # 首先合并根目录
-                # 单引擎模式：正常合并
-                root_output_path = os.path.join(
-                    self.final_pdf_dir,
-                    f"{domain}_{current_date}.pdf"
-                )
-                if self.merge_pdfs_stream(self.pdf_dir, root_output_path):
-                    merged_files.append(root_output_path)
-
-                # 然后合并所有子目录
-                try:
-                    items = os.listdir(self.pdf_dir)
-                    self.logger.debug(f"PDF目录中的所有项目: {items}")
-
-                    for item in items:
-                        try:
-                            item_path = os.path.join(self.pdf_dir, item)
-
-                            # 跳过非目录和特殊目录
-                            if not os.path.isdir(item_path) or item in ['finalPdf', 'metadata', '.temp']:
-                                self.logger.debug(f"跳过项目: {item} (非目录或特殊目录)")
-                                continue
-
-                            pass  # Processing subdirectory silently
-                            
-                            # 单引擎模式：正常合并
-                            output_path = os.path.join(
-                                self.final_pdf_dir,
-                                f"{item}_{current_date}.pdf"
-                            )
-                            if self.merge_pdfs_stream(item_path, output_path):
-                                merged_files.append(output_path)
-
-                        except Exception as e:
-                            self.logger.error(f"处理子目录 {item} 时出错: {e}")
-                            self.logger.error(f"错误详情: {traceback.format_exc()}")
-                            continue
-
-                except Exception as e:
-                    self.logger.error(f"列出PDF目录内容时出错: {e}")
-                    self.logger.error(f"错误详情: {traceback.format_exc()}")
-
-            return merged_files
-
-        except Exception as e:
-            error_msg = f"目录合并失败: {e}"
-            self.logger.error(error_msg)
-            self.logger.error(f"错误详情: {traceback.format_exc()}")
-            raise FileProcessingError(error_msg)
-
-    def get_statistics(self) -> Dict[str, Any]:
-        """获取合并统计信息"""
-        elapsed_time = 0
-        if self.stats['start_time']:
-            elapsed_time = time.time() - self.stats['start_time']
-
-        return {
-            'files_processed': self.stats['files_processed'],
-            'total_pages': self.stats['total_pages'],
-            'elapsed_time': elapsed_time,
-            'memory_peak_mb': self.stats['memory_peak'],
-            'errors_count': len(self.stats['errors']),
-            'errors': self.stats['errors'][-10:],  # 最近10个错误
-            'avg_pages_per_file': (
-                self.stats['total_pages'] / self.stats['files_processed']
-                if self.stats['files_processed'] > 0 else 0
-            ),
-            'processing_speed': (
-                self.stats['files_processed'] / elapsed_time
-                if elapsed_time > 0 else 0
-            )
-        }
-
-    def run(self) -> Dict[str, Any]:
-        """运行PDF合并任务"""
-        self.stats['start_time'] = time.time()
-
-        try:
-            # 执行合并
-            merged_files = self.merge_directory()
-
-            # 获取统计信息
-            stats = self.get_statistics()
-
-            result = {
-                'success': True,
-                'merged_files': merged_files,
-                'statistics': stats
-            }
-
-            # Task completed successfully (detailed stats printed separately)
-
-            return result
-
-        except Exception as e:
-            error_msg = f"PDF合并任务失败: {e}"
-            self.logger.error(error_msg)
-            self.logger.error(f"错误详情: {traceback.format_exc()}")
-
-            return {
-                'success': False,
-                'error': error_msg,
-                'statistics': self.get_statistics()
-            }
-
-def main():
-    """主函数，支持命令行执行"""
-    import sys
-    import argparse
-
-    parser = argparse.ArgumentParser(description='Smart PDF Merger Tool')
-    parser.add_argument('--config', default='config.json', help='Configuration file path')
-    parser.add_argument('--directory', help='Specify directory name to merge')
-    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
-
-    args = parser.parse_args()
-
-    # 设置日志级别
-    if args.verbose:
-        logging.basicConfig(level=logging.INFO)
-    else:
-        logging.basicConfig(level=logging.WARNING)
-
-    try:
-        # 创建PDF合并器
-        merger = PDFMerger(config_path=args.config)
-
-        # 执行合并
-        if args.directory:
-            merged_files = merger.merge_directory(args.directory)
-        else:
-            result = merger.run()
-            merged_files = result.get('merged_files', [])
-
-        # Output results  
-        print(f"\n✅ Merge completed! Generated {len(merged_files)} PDF file(s):")
-        for file_path in merged_files:
-            print(f"  📄 {file_path}")
-
-        # Output statistics
-        stats = merger.get_statistics()
-        print(f"\n📊 Statistics:")
-        print(f"  - Files processed: {stats['files_processed']}")
-        print(f"  - Total pages: {stats['total_pages']}")
-        print(f"  - Duration: {stats['elapsed_time']:.1f} seconds")
-        print(f"  - Memory peak: {stats['memory_peak_mb']:.1f} MB")
-
-        if stats['errors_count'] > 0:
-            print(f"  ⚠️  Errors: {stats['errors_count']}")
-
-        return 0
-
-    except Exception as e:
-        print(f"❌ Execution failed: {e}", file=sys.stderr)
-        print(f"Error details: {traceback.format_exc()}", file=sys.stderr)
-        return 1
-
-if __name__ == '__main__':
-    sys.exit(main())
+#!/usr/bin/env python3
+"""
+优化的PDF合并服务类 - 修复文件排序支持数字索引
+"""
+
+import os
+import re
+import sys
+import json
+import logging
+from datetime import datetime
+from urllib.parse import urlparse
+from typing import Dict, List, Optional, Callable, Any
+import gc
+import functools
+import multiprocessing
+import time
+
+try:
+    import resource
+except ImportError:
+    # Windows没有resource模块，内存监控自动停用
+    resource = None
+
+try:
+    import orjson
+except ImportError:
+    # orjson不可用时回退到标准库json，仅损失解析速度
+    orjson = None
+import traceback
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+from logging.handlers import QueueHandler, QueueListener
+
+# ru_maxrss的单位：Linux为KB，macOS为字节
+_RU_MAXRSS_DIVISOR = 1024 * 1024 if sys.platform == 'darwin' else 1024
+
+# 文件名前缀分类（模块级预编译，单次扫描替代split+int+异常路径）
+# 数字前缀：000-xxx.pdf、1-xxx.pdf（含补零）
+_NUMERIC_PREFIX_RE = re.compile(r'^(\d+)-')
+# 哈希前缀：8位十六进制，如 676cb9dd-xxx.pdf
+_HASH_PREFIX_RE = re.compile(r'^[0-9a-fA-F]{8}-')
+
+@functools.lru_cache(maxsize=8)
+def _load_titles_json(path: str, mtime_ns: int) -> Dict[str, str]:
+    """
+    读取并缓存articleTitles.json
+
+    每个PDFMerger实例都会加载标题表，模块级缓存避免同一进程内的
+    重复open+解析；mtime参与缓存键，文件被改写后自动失效。
+    大标题表用orjson解析（直接收bytes，比标准库快数倍），
+    键intern后热路径查找走指针比较。
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+
+    titles = orjson.loads(data) if orjson is not None else json.loads(data)
+    return {sys.intern(key): value for key, value in titles.items()}
+
+@functools.lru_cache(maxsize=8)
+def _load_section_json(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """读取并缓存sectionStructure.json（mtime参与缓存键，同上）"""
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _normalize_title_keys(article_titles: Dict[str, str]) -> Dict[str, str]:
+    """
+    展开文章标题映射的键变体（"1"/"01"/"001"/"0001"）
+
+    加载时一次性展开后，书签标题查找只需一次dict命中，
+    不用每个文件构造候选键列表再逐个尝试。
+    原始键优先，变体用setdefault补充，避免覆盖显式条目。
+    """
+    normalized = dict(article_titles)
+    for key, title in article_titles.items():
+        if key.isdigit():
+            num_str = str(int(key))
+            normalized.setdefault(num_str, title)
+            normalized.setdefault(num_str.zfill(2), title)
+            normalized.setdefault(num_str.zfill(3), title)
+            normalized.setdefault(num_str.zfill(4), title)
+    return normalized
+
+# 回退标题格式化用的分隔符转换表（连字符/下划线 -> 空格）
+_SEP_TRANS = str.maketrans('-_', '  ')
+
+# 已知域名 -> 友好文件名映射（数据驱动，新增站点只需加一行）
+_DOMAIN_FRIENDLY = {
+    'anthropic.com': 'Claude-Code-Docs',
+    'github.com': 'GitHub-Docs',
+}
+_DOMAIN_FRIENDLY_RE = re.compile(
+    '|'.join(re.escape(domain) for domain in _DOMAIN_FRIENDLY)
+)
+
+def _strip_engine(filename: str) -> str:
+    """
+    移除文件名中的引擎后缀（xxx_puppeteer.pdf -> xxx.pdf）
+
+    endswith判断一次后缀即可，比'in'+replace少一次全串扫描，
+    无后缀的常见情形零拷贝。
+    """
+    if filename.endswith('_puppeteer.pdf'):
+        return filename[:-len('_puppeteer.pdf')] + '.pdf'
+    return filename
+
+def _prefetch_open(fitz_module, file_path: str):
+    """
+    预读线程中打开单个源PDF
+
+    打开前用posix_fadvise(WILLNEED)提示内核把文件预读进页缓存——
+    页缓存是全局的，提示在fd关闭后依然有效，MuPDF随后的读取直接命中。
+    非POSIX平台自动跳过提示。
+    """
+    if hasattr(os, 'posix_fadvise'):
+        try:
+            fd = os.open(file_path, os.O_RDONLY)
+            try:
+                os.posix_fadvise(fd, 0, 0, os.POSIX_FADV_WILLNEED)
+            finally:
+                os.close(fd)
+        except OSError:
+            pass  # 提示失败无碍，正常打开即可
+
+    return fitz_module.open(file_path)
+
+@functools.lru_cache(maxsize=8)
+def _load_config_json(path: str, mtime_ns: int) -> Dict[str, Any]:
+    """
+    读取并缓存config.json的解析结果
+
+    mtime参与缓存键：文件被修改后自动失效。同一进程内反复构造
+    PDFMerger（以及单目录模式的重复调用）不再重复open+解析。
+    """
+    with open(path, 'rb') as f:
+        data = f.read()
+    return orjson.loads(data) if orjson is not None else json.loads(data)
+
+def _init_worker_logging(log_queue) -> None:
+    """
+    工作进程日志初始化
+
+    只挂一个QueueHandler，把日志记录发回父进程统一写出，
+    避免多个进程直接争抢stderr和同一个日志文件。
+
+    fork启动方式下子进程会继承父进程的Stream/FileHandler，
+    必须先清掉再挂QueueHandler，否则worker仍直接写共享的
+    stderr和日志文件，队列形同虚设。
+    """
+    logger = logging.getLogger('PDFMerger')
+    logger.handlers.clear()
+    logger.addHandler(QueueHandler(log_queue))
+    logger.setLevel(logging.WARNING)
+
+def _merge_subdirectory_worker(
+    config_path: str,
+    directory_path: str,
+    output_path: str
+) -> Dict[str, Any]:
+    """
+    子进程工作函数：合并单个子目录
+
+    每个子目录的合并相互独立（不同的输入文件、不同的输出文件），
+    因此可以跨进程并行执行。必须是模块级函数以便被pickle。
+
+    Args:
+        config_path: 配置文件路径（在子进程中重新加载）
+        directory_path: 要合并的子目录路径
+        output_path: 合并后的PDF输出路径
+
+    Returns:
+        包含 success、output_path 和统计信息的字典
+    """
+    merger = PDFMerger(config_path=config_path)
+    success = merger.merge_pdfs_stream(directory_path, output_path)
+    return {
+        'success': success,
+        'output_path': output_path,
+        'stats': merger.stats
+    }
+
+class PDFMergerError(Exception):
+    """PDF合并相关异常"""
+    pass
+
+class ConfigurationError(PDFMergerError):
+    """配置错误异常"""
+    pass
+
+class FileProcessingError(PDFMergerError):
+    """文件处理异常"""
+    pass
+
+class PDFMerger:
+    """
+    企业级PDF合并服务类 - 智能排序版本
+
+    特性：
+    - 智能文件排序（支持数字索引和哈希前缀）
+    - 流式处理，避免内存溢出
+    - 完整的错误处理和恢复机制
+    - 进度跟踪和性能监控
+    """
+
+    def __init__(self, config_path: str = 'config.json', logger: Optional[logging.Logger] = None):
+        """
+        初始化PDF合并器
+
+        Args:
+            config_path: 配置文件路径
+            logger: 可选的日志记录器
+        """
+        self.config_path = config_path
+        self.logger = logger or self._setup_logger()
+
+        # 加载配置
+        self.config = self._load_config(config_path)
+
+        # rootURL在运行期间不变，解析一次后复用
+        self._parsed_root_url = urlparse(self.config['rootURL'])
+
+        # 输出文件名的域名/时间戳标签在实例生命周期内固定，提前算好，
+        # 顺带保证同一次运行产出的所有文件共用同一时间戳（含秒）
+        hostname = self._parsed_root_url.hostname
+        self._domain_tag = hostname.replace('.', '_') if hostname else 'unknown'
+        self._date_tag = datetime.now().strftime('%Y%m%d_%H%M%S')
+
+        # 设置路径
+        self.pdf_dir = self.config['pdfDir']
+        self.metadata_dir = os.path.join(
+            self.pdf_dir,
+            self.config.get('metadata', {}).get('directory', 'metadata')
+        )
+        self.final_pdf_dir = os.path.join(
+            self.pdf_dir,
+            self.config.get('output', {}).get('finalPdfDirectory', 'finalPdf')
+        )
+
+        # 性能监控。errors只保留最近10条（有界deque防止长批量任务
+        # 内存无限增长），完整数量见errors_total
+        self.stats = {
+            'files_processed': 0,
+            'total_pages': 0,
+            'start_time': None,
+            'memory_peak': 0,
+            'errors': deque(maxlen=10),
+            'errors_total': 0
+        }
+        self._last_memory_check = 0.0
+
+        # 加载文章标题，并展开键变体供书签标题做单次查找
+        self.article_titles = self._load_article_titles()
+        self._normalized_titles = _normalize_title_keys(self.article_titles)
+
+        # 加载section结构（用于分层TOC）
+        self.section_structure = self._load_section_structure()
+
+    def _setup_logger(self) -> logging.Logger:
+        """设置默认日志记录器"""
+        logger = logging.getLogger('PDFMerger')
+        if not logger.handlers:
+            formatter = logging.Formatter(
+                '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+            )
+
+            # Console handler (stderr)
+            console_handler = logging.StreamHandler()
+            console_handler.setFormatter(formatter)
+            logger.addHandler(console_handler)
+
+            # File handler (logs/python_pdf_merger.log)
+            try:
+                log_dir = os.path.join(os.path.dirname(__file__), '..', '..', 'logs')
+                os.makedirs(log_dir, exist_ok=True)
+                log_file = os.path.join(log_dir, 'python_pdf_merger.log')
+                file_handler = logging.FileHandler(log_file, encoding='utf-8')
+                file_handler.setFormatter(formatter)
+                logger.addHandler(file_handler)
+            except Exception as e:
+                # If file handler fails, continue with console only
+                logger.warning(f"无法创建文件日志处理器: {e}")
+
+            logger.setLevel(logging.WARNING)  # Only show warnings and errors
+        return logger
+
+    def _load_config(self, config_path: str) -> Dict[str, Any]:
+        """加载配置文件"""
+        try:
+            if not os.path.exists(config_path):
+                raise ConfigurationError(f"配置文件不存在: {config_path}")
+
+            config = _load_config_json(config_path, os.stat(config_path).st_mtime_ns)
+
+            # 验证必需的配置项
+            required_keys = ['rootURL', 'pdfDir']
+            for key in required_keys:
+                if key not in config:
+                    raise ConfigurationError(f"缺少必需的配置项: {key}")
+
+            return config
+
+        except json.JSONDecodeError as e:
+            raise ConfigurationError(f"配置文件JSON格式错误: {e}")
+        except Exception as e:
+            raise ConfigurationError(f"配置加载失败: {e}")
+
+    def _load_article_titles(self) -> Dict[str, str]:
+        """加载文章标题映射"""
+        article_titles = {}
+
+        try:
+            # 尝试从元数据目录加载
+            metadata_file = os.path.join(self.metadata_dir, 'articleTitles.json')
+            if os.path.exists(metadata_file):
+                article_titles = _load_titles_json(
+                    metadata_file, os.stat(metadata_file).st_mtime_ns
+                )
+
+            # 回退到PDF目录
+            if not article_titles:
+                fallback_file = os.path.join(self.pdf_dir, 'articleTitles.json')
+                if os.path.exists(fallback_file):
+                    article_titles = _load_titles_json(
+                        fallback_file, os.stat(fallback_file).st_mtime_ns
+                    )
+
+        except Exception as e:
+            self.logger.warning(f"加载文章标题失败: {e}")
+
+        return article_titles
+
+    def _load_section_structure(self) -> Optional[Dict[str, Any]]:
+        """加载section结构信息（用于分层TOC）"""
+        section_structure = None
+
+        try:
+            # 尝试从元数据目录加载
+            metadata_file = os.path.join(self.metadata_dir, 'sectionStructure.json')
+            if os.path.exists(metadata_file):
+                section_structure = _load_section_json(
+                    metadata_file, os.stat(metadata_file).st_mtime_ns
+                )
+                self.logger.info("已加载section结构: %d sections", len(section_structure.get('sections', [])))
+                return section_structure
+
+            # 回退到PDF目录
+            fallback_file = os.path.join(self.pdf_dir, 'sectionStructure.json')
+            if os.path.exists(fallback_file):
+                section_structure = _load_section_json(
+                    fallback_file, os.stat(fallback_file).st_mtime_ns
+                )
+                self.logger.info("已加载section结构（从PDF目录）: %d sections", len(section_structure.get('sections', [])))
+                return section_structure
+
+        except Exception as e:
+            self.logger.debug("加载section结构失败（将使用flat TOC）: %s", e)
+
+        return section_structure
+
+    def _validate_article_titles(self, pdf_file_count: int) -> bool:
+        """
+        验证 articleTitles.json 是否有效
+
+        Args:
+            pdf_file_count: PDF文件数量（用于比较）
+
+        Returns:
+            bool: 是否有效
+        """
+        if not self.article_titles:
+            self.logger.warning(
+                "⚠️  articleTitles.json 为空或不存在！\n"
+                "    PDF 目录将显示文件名（如 'Page 0', 'Page 1'）而非实际标题。\n"
+                "    可能原因：\n"
+                "      1. 标题提取失败（检查 contentSelector 配置）\n"
+                "      2. 页面加载不完整（检查 navigationWaitUntil 配置）\n"
+                "      3. 页面缺少标题元素（<title> 或 h1-h3）\n"
+                "    建议：重新运行爬取并检查日志中的标题提取警告"
+            )
+            return False
+
+        # 检查标题数量是否合理
+        title_count = len(self.article_titles)
+        if title_count < pdf_file_count * 0.5:
+            self.logger.warning(
+                f"⚠️  标题数量 ({title_count}) 远少于 PDF 文件数量 ({pdf_file_count})！\n"
+                f"    约 {pdf_file_count - title_count} 个页面的标题提取失败。\n"
+                f"    建议：检查爬取日志中的标题提取警告"
+            )
+            return False
+
+        self.logger.info("✓ articleTitles 验证通过: %d 个标题", title_count)
+        return True
+
+    def _get_pdf_files(self, directory_path: str, engine_filter: str = None) -> List[str]:
+        """
+        获取目录中的PDF文件列表（智能排序）
+
+        支持：
+        1. 数字前缀文件（000-xxx.pdf, 001-xxx.pdf）- 按数字排序
+        2. 哈希前缀文件（676cb9dd-xxx.pdf）- 按文件创建时间排序
+        3. 混合情况 - 数字文件优先，然后哈希文件
+        4. 引擎过滤：只获取特定引擎生成的PDF文件
+
+        Args:
+            directory_path: 目录路径
+            engine_filter: 引擎过滤器，可选值：'puppeteer', None(所有文件)
+        """
+        try:
+            if not os.path.exists(directory_path):
+                return []
+
+            # os.scandir复用DirEntry缓存的类型信息，避免每个条目一次额外stat；
+            # 哈希前缀文件按mtime排序，顺手从DirEntry取出mtime缓存，
+            # 排序键里就不用再对每个文件调用os.path.getmtime
+            files = []
+            hash_mtimes = {}
+            with os.scandir(directory_path) as entries:
+                for e in entries:
+                    if not (e.name.endswith('.pdf') and e.is_file(follow_symlinks=False)):
+                        continue
+                    files.append(e.name)
+                    if _HASH_PREFIX_RE.match(_strip_engine(e.name)):
+                        try:
+                            hash_mtimes[e.name] = e.stat().st_mtime
+                        except OSError:
+                            hash_mtimes[e.name] = 0
+            self.logger.debug("目录 %s 中的PDF文件: %s", directory_path, files)
+
+            # 根据引擎过滤PDF文件
+            if engine_filter:
+                if engine_filter == 'puppeteer':
+                    # 只要包含_puppeteer的文件
+                    files = [f for f in files if '_puppeteer.pdf' in f]
+                elif engine_filter == 'single':
+                    # 只要不包含_puppeteer的文件（单引擎模式的文件）
+                    files = [f for f in files if '_puppeteer.pdf' not in f]
+
+            if not files:
+                return []
+
+            self.logger.debug("过滤后的PDF文件 (engine_filter=%s): %s", engine_filter, files)
+
+            # 快速通道：爬虫输出的典型情形是全部文件带三位补零数字前缀，
+            # 此时字典序即数字序，直接用C层list.sort，跳过逐文件排序键计算
+            if all(f[:3].isdigit() and f[3:4] == '-' for f in files):
+                files.sort()
+
+                if len(files) > 10:
+                    engine_info = f" ({engine_filter} engine)" if engine_filter else ""
+                    self.logger.info("Found %d PDF files in %s%s", len(files), directory_path, engine_info)
+
+                self.logger.debug("排序后文件列表前5个: %s", files[:5])
+                return files
+
+            # 🔥 智能排序逻辑：支持数字前缀和哈希前缀
+            def get_sort_key(filename: str) -> tuple:
+                # 对于双引擎文件，需要去掉_puppeteer后缀来获取前缀
+                name_for_sorting = _strip_engine(filename)
+
+                # 数字前缀（含补零），按数字大小排序，优先级最高
+                match = _NUMERIC_PREFIX_RE.match(name_for_sorting)
+                if match:
+                    return (0, int(match.group(1)), filename)
+
+                # 哈希前缀（8位十六进制），按文件创建时间排序，优先级次高
+                # （mtime已在scandir阶段从DirEntry缓存）
+                if _HASH_PREFIX_RE.match(name_for_sorting):
+                    return (1, hash_mtimes.get(filename, 0), filename)
+
+                # 其他情况，按文件名字母排序，优先级最低
+                return (2, 0, filename)
+
+            # 装饰-排序-还原：每个文件只计算一次排序键，
+            # 并复用键中的分类信息做统计，避免二次split/前缀检查
+            decorated = sorted((get_sort_key(f), f) for f in files)
+            files = [f for _, f in decorated]
+
+            # Only log if there are significant numbers of files
+            if len(files) > 10:
+                engine_info = f" ({engine_filter} engine)" if engine_filter else ""
+                self.logger.info("Found %d PDF files in %s%s", len(files), directory_path, engine_info)
+
+            self.logger.debug("排序后文件列表前5个: %s", files[:5])
+            return files
+
+        except Exception as e:
+            # exc_info=True让traceback只在handler真正格式化时才渲染
+            self.logger.error(f"获取PDF文件列表失败: {e}", exc_info=True)
+            return []
+
+    def _create_bookmark_title(self, filename: str) -> str:
+        """
+        创建书签标题（改进版）
+        
+        🔧 修复：正确处理引擎后缀，避免标题中出现"Puppeteer"
+
+        优先级：
+        1. 文章标题映射
+        2. 清理后的文件名（移除引擎后缀）
+        
+        支持的文件名格式：
+        - 001-page-name.pdf → "Page Name"
+        - 001-page-name_puppeteer.pdf → "Page Name" (移除引擎后缀)
+        - 001-page-name_puppeteer.pdf → "Page Name" (移除引擎后缀)
+        """
+        try:
+            self.logger.debug("为文件创建书签标题: %s", filename)
+
+            # 🔥 首先移除引擎后缀（_puppeteer）
+            cleaned_filename = _strip_engine(filename)
+            if cleaned_filename != filename:
+                self.logger.debug("移除Puppeteer引擎后缀: %s -> %s", filename, cleaned_filename)
+
+            # 提取前缀和文件名部分
+            parts = cleaned_filename.split('-', 1)  # 只分割第一个连字符
+            if len(parts) < 2:
+                title = os.path.splitext(cleaned_filename)[0]
+                self.logger.debug("无前缀文件，使用文件名作为标题: %s", title)
+                return title
+
+            prefix = parts[0]
+            name_part = parts[1]
+
+            # 🔥 尝试从文章标题映射中查找
+            # 补零等键变体已在加载时展开（_normalize_title_keys），
+            # 这里一次dict命中即可
+            title = self._normalized_titles.get(prefix)
+            if title is not None:
+                self.logger.debug("找到文章标题映射 %s: %s", prefix, title)
+                return title
+
+            # 如果没找到映射，使用清理后的文件名
+            cleaned_name = os.path.splitext(name_part)[0]
+            # translate一次替换两种分隔符，str.title()一次C层扫描完成首字母大写
+            # （文件名派生的标题不含撇号等会让title()出歧义的字符）
+            title = cleaned_name.translate(_SEP_TRANS).title()
+
+            self.logger.debug("使用清理后的文件名作为标题: %s", title)
+            return title
+
+        except Exception as e:
+            self.logger.warning(f"创建书签标题失败 {filename}: {e}")
+            return os.path.splitext(filename)[0]
+
+    def _build_hierarchical_toc(
+        self,
+        files: List[str],
+        file_page_map: Dict[str, int],
+        file_to_index: Dict[str, str]
+    ) -> List[List[Any]]:
+        """
+        构建分层TOC结构
+
+        Args:
+            files: PDF文件名列表（按合并顺序）
+            file_page_map: 文件名 -> 合并后起始页映射（插入时记录，0-based）
+            file_to_index: 文件名 -> 索引映射
+
+        Returns:
+            分层TOC列表 [[level, title, page, link], ...]
+        """
+        toc = []
+
+        if not self.section_structure or 'sections' not in self.section_structure:
+            # Fallback到flat TOC
+            self.logger.debug("没有section结构，使用flat TOC")
+            return None
+
+        sections = self.section_structure['sections']
+
+        # 🔥 性能优化：预先构建反向索引 (index -> filename) 以避免O(n²)嵌套循环
+        index_to_file = {}  # index -> filename
+        for filename in files:
+            file_index = file_to_index.get(filename)
+            if file_index:
+                index_to_file[file_index] = filename
+
+        self.logger.debug("构建索引映射: %d 个文件", len(index_to_file))
+
+        # 遍历每个section
+        for section in sections:
+            section_title = section.get('title', 'Untitled Section')
+            section_pages = section.get('pages', [])
+
+            if not section_pages:
+                # 跳过空section
+                continue
+
+            # 找到该section的第一个有效页面作为section链接目标
+            section_start_page = None
+            valid_pages = []
+
+            for page_info in section_pages:
+                page_index = page_info.get('index')
+                if not page_index:
+                    continue
+
+                # 🔥 O(1) 查找而不是O(n)嵌套循环
+                found_file = index_to_file.get(page_index)
+
+                if found_file and found_file in file_page_map:
+                    page_start = file_page_map[found_file]
+                    page_title = self.article_titles.get(page_index, f"Page {page_index}")
+
+                    if section_start_page is None:
+                        section_start_page = page_start
+
+                    valid_pages.append((page_title, page_start))
+
+            # 如果该section有有效页面，添加到TOC
+            if valid_pages:
+                # 添加section标题（level 1）；三元组形式由set_toc生成默认跳转链接
+                toc.append((
+                    1,  # Level 1: Section
+                    section_title,
+                    section_start_page + 1  # PyMuPDF页码从1开始
+                ))
+
+                # 添加该section下的页面（level 2），一次extend省去逐条append
+                toc.extend(
+                    (2, page_title, page_start + 1)
+                    for page_title, page_start in valid_pages
+                )
+
+        if self.logger.isEnabledFor(logging.INFO):
+            # 两次整表扫描只为日志计数，级别未启用时直接跳过
+            n_sections = sum(1 for t in toc if t[0] == 1)
+            self.logger.info("构建了分层TOC: %d sections, %d pages", n_sections, len(toc) - n_sections)
+        return toc
+
+    def _monitor_memory(self) -> None:
+        """监控内存使用情况（每秒至多采样一次）"""
+        if resource is None:
+            return
+
+        # 节流：getrusage虽然只是一次系统调用，也没必要每个文件都做
+        now = time.monotonic()
+        if now - self._last_memory_check < 1.0:
+            return
+        self._last_memory_check = now
+
+        try:
+            # ru_maxrss本身就是进程RSS峰值，正好对应memory_peak统计
+            rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+            memory_mb = rss / _RU_MAXRSS_DIVISOR
+            self.stats['memory_peak'] = max(self.stats['memory_peak'], memory_mb)
+        except Exception:
+            pass  # 内存监控失败不应影响主流程
+
+    def _generate_friendly_filename(self, directory_name: str, current_date: str) -> str:
+        """
+        生成用户友好的PDF文件名
+        
+        转换规则：
+        - docs.anthropic.com-docs -> Claude-Code-Docs
+        - github.com-docs -> GitHub-Docs  
+        - example.com-api -> Example-API
+        """
+        try:
+            # 移除常见的域名后缀和前缀
+            clean_name = directory_name
+
+            # 处理 docs.anthropic.com-docs 格式：已知域名查表，
+            # 单次正则扫描替代逐域名substring链
+            match = _DOMAIN_FRIENDLY_RE.search(clean_name)
+            if match:
+                clean_name = _DOMAIN_FRIENDLY[match.group(0)]
+            else:
+                # 通用处理：移除域名部分，只保留内容类型
+                if '-' in clean_name:
+                    parts = clean_name.split('-')
+                    # 取最后一部分作为内容类型
+                    content_type = parts[-1]
+                    if '.' in parts[0]:
+                        # 提取域名的主要部分
+                        domain_parts = parts[0].split('.')
+                        main_domain = domain_parts[-2] if len(domain_parts) > 1 else domain_parts[0]
+                        clean_name = f"{main_domain.title()}-{content_type.title()}"
+                    else:
+                        clean_name = content_type.title()
+                else:
+                    clean_name = clean_name.replace('.', '-').title()
+            
+            return f"{clean_name}_{current_date}.pdf"
+            
+        except Exception as e:
+            self.logger.warning(f"文件名优化失败，使用原始名称: {e}")
+            return f"{directory_name}_{current_date}.pdf"
+
+    def merge_pdfs_stream(
+        self,
+        directory_path: str,
+        output_path: str,
+        progress_callback: Optional[Callable[[int, int], None]] = None,
+        engine_filter: str = None
+    ) -> bool:
+        """流式合并PDF文件"""
+        # PyMuPDF的导入要加载MuPDF原生库，开销较大；延迟到真正合并时再导入，
+        # 让只用到排序/标题工具的调用方（以及尚未领到任务的工作进程）免于初始化。
+        # 首次导入后由sys.modules缓存，重复调用无额外开销
+        import fitz  # PyMuPDF
+
+        try:
+            files = self._get_pdf_files(directory_path, engine_filter)
+            if not files:
+                return False
+
+            # 验证 articleTitles.json
+            self._validate_article_titles(len(files))
+
+            # 书签标题一次性预计算，插入循环内退化为O(1)字典查找
+            bookmark_titles = {
+                name: self._create_bookmark_title(name)
+                for name in files
+            }
+
+            merged_pdf = None
+
+            try:
+                # 确保输出目录存在
+                os.makedirs(os.path.dirname(output_path), exist_ok=True)
+
+                merged_pdf = fitz.open()  # 创建空的PDF文档
+
+                # 预分配目录结构（按索引赋值，跳过的文件留None，最后压缩）
+                toc = [None] * len(files)
+                running_pages = 0  # 在Python侧跟踪累计页数，避免每轮跨C边界查询
+
+                # 🔥 新增：收集信息用于构建分层TOC
+                file_start_pages = {}  # filename -> 合并后的起始页（0-based）
+                file_to_index = {}  # filename -> index (用于匹配sectionStructure)
+
+                # Starting merge operation (logging reduced for cleaner output)
+
+                # 预读窗口：后台线程提前打开接下来的几个源文件（fitz.open
+                # 在MuPDF解析时释放GIL），让磁盘读取与串行的insert_pdf重叠。
+                # merged_pdf非线程安全，插入仍由主线程按文件顺序执行
+                total = len(files)
+                prefetch_window = min(4, total)
+                pending = deque()
+                next_index = prefetch_window
+
+                def _submit_open(index: int) -> None:
+                    file_path = os.path.join(directory_path, files[index])
+                    pending.append((index, files[index], opener.submit(_prefetch_open, fitz, file_path)))
+
+                with ThreadPoolExecutor(max_workers=max(prefetch_window, 1)) as opener:
+                    for index in range(prefetch_window):
+                        _submit_open(index)
+
+                    try:
+                        while pending:
+                            i, filename, open_future = pending.popleft()
+
+                            # 滑动窗口：每消费一个就补提交一个打开任务
+                            if next_index < total:
+                                _submit_open(next_index)
+                                next_index += 1
+
+                            try:
+                                self.logger.debug("处理文件 %d/%d: %s", i + 1, total, filename)
+
+                                source_pdf = open_future.result()
+                                try:
+                                    page_count = source_pdf.page_count
+                                    start_page = running_pages
+
+                                    if page_count == 0:
+                                        self.logger.warning("跳过空PDF文件: %s", filename)
+                                        continue
+
+                                    # annots=False：合并后的目录由set_toc自建，
+                                    # 源PDF的注释结构无人消费，跳过拷贝；
+                                    # links=True保留正文内的超链接。
+                                    # final=1告知MuPDF该源不会再次插入，
+                                    # 立即释放对应的graft map
+                                    merged_pdf.insert_pdf(
+                                        source_pdf, links=True, annots=False, final=1
+                                    )
+                                    running_pages += page_count
+                                finally:
+                                    source_pdf.close()
+
+                                # 收缩MuPDF内部的glyph/image store：它跨insert_pdf
+                                # 调用持续增长（上游PyMuPDF#1430类内存平台问题），
+                                # 而逐篇合并几乎没有跨文件缓存命中可言
+                                if hasattr(fitz, 'TOOLS'):
+                                    fitz.TOOLS.store_shrink(100)
+
+                                # 🔥 新增：记录信息用于分层TOC
+                                # 插入时就知道起始页，无需事后再对页数做前缀和
+                                file_start_pages[filename] = start_page
+
+                                # 从文件名提取索引（支持 001-xxx.pdf 和 001-xxx_puppeteer.pdf）
+                                # 正则一步完成前缀提取+数字校验，int()本身就忽略
+                                # 前导零（"001" → 1），无需split/isdigit/lstrip链
+                                match = _NUMERIC_PREFIX_RE.match(_strip_engine(filename))
+                                if match:
+                                    file_to_index[filename] = str(int(match.group(1)))
+
+                                # 创建书签（用于flat TOC fallback）
+                                bookmark_title = bookmark_titles[filename]
+                                # 三元组简单形式即可，set_toc默认生成跳转链接；
+                                # 省掉每个条目一个链接dict的分配
+                                toc[i] = (
+                                    1,  # 级别
+                                    bookmark_title,  # 标题
+                                    start_page + 1  # 页码（从1开始）
+                                )
+
+                                # 更新统计
+                                self.stats['files_processed'] += 1
+                                self.stats['total_pages'] += page_count
+
+                                # 内存监控
+                                self._monitor_memory()
+
+                                # 进度回调
+                                if progress_callback:
+                                    progress_callback(i + 1, total)
+
+                                self.logger.debug("已合并: %s (%d 页) -> 书签: %s", filename, page_count, bookmark_title)
+
+                            except Exception as e:
+                                error_msg = f"处理文件失败 {filename}: {e}"
+                                self.logger.error(error_msg, exc_info=True)
+                                self.stats['errors'].append(error_msg)
+                                self.stats['errors_total'] += 1
+
+                                # 继续处理下一个文件
+                                continue
+
+                    finally:
+                        # 异常退出时关闭预读窗口中已打开的文档
+                        for _, _, open_future in pending:
+                            try:
+                                open_future.result().close()
+                            except Exception:
+                                pass
+
+                # 压缩掉跳过/失败文件留下的空位
+                toc = [entry for entry in toc if entry is not None]
+
+                # 🔥 新增：尝试构建分层TOC
+                hierarchical_toc = None
+                if self.section_structure:
+                    try:
+                        hierarchical_toc = self._build_hierarchical_toc(files, file_start_pages, file_to_index)
+                        if hierarchical_toc:
+                            self.logger.info("使用分层TOC结构")
+                            toc = hierarchical_toc
+                        else:
+                            self.logger.info("使用flat TOC结构（无section信息）")
+                    except Exception as e:
+                        self.logger.warning(f"构建分层TOC失败，使用flat TOC: {e}")
+                        # toc已经包含flat结构，无需修改
+
+                # 设置目录结构（如果启用了书签功能）
+                bookmarks_enabled = self.config.get('pdf', {}).get('bookmarks', True)
+                if bookmarks_enabled and toc:
+                    merged_pdf.set_toc(toc)
+                    self.logger.info("已创建PDF目录，包含 %d 个书签", len(toc))
+                elif not bookmarks_enabled:
+                    self.logger.info("书签功能已禁用，跳过目录创建")
+
+                # 保存合并后的PDF：garbage=4物理清除重复对象（逐篇生成的
+                # PDF共享大量字体），use_objstms把元数据打包进对象流。
+                # 图片流本身已压缩，deflate_images只浪费CPU；clean的内容流
+                # 重写同理，均不启用。
+                # 用1MB写缓冲包装输出，减少大文件写出时的小块write系统调用
+                with open(output_path, 'wb', buffering=1 << 20) as output_file:
+                    merged_pdf.save(
+                        output_file,
+                        garbage=4,
+                        deflate=True,
+                        deflate_images=False,
+                        deflate_fonts=True,
+                        clean=False,
+                        use_objstms=1
+                    )
+
+                return True
+
+            except Exception as e:
+                error_msg = f"PDF合并失败: {e}"
+                self.logger.error(error_msg, exc_info=True)
+                self.stats['errors'].append(error_msg)
+                self.stats['errors_total'] += 1
+                raise FileProcessingError(error_msg)
+
+            finally:
+                # 清理资源
+                if merged_pdf:
+                    merged_pdf.close()
+
+                # 强制垃圾回收
+                gc.collect()
+
+        except Exception as e:
+            self.logger.error(f"merge_pdfs_stream 执行失败: {e}", exc_info=True)
+            return False
+
+    def _has_direct_pdfs(self, directory_path: str) -> bool:
+        """检查目录下是否直接存在PDF文件（短路扫描，不排序不统计）"""
+        try:
+            with os.scandir(directory_path) as entries:
+                return any(
+                    e.name.endswith('.pdf') and e.is_file(follow_symlinks=False)
+                    for e in entries
+                )
+        except OSError:
+            return False
+
+    def _detect_dual_engine_mode(self, directory_path: str) -> bool:
+        """检测是否为双引擎模式（已弃用，现在只支持Puppeteer）"""
+        # 双引擎模式已移除，始终返回False
+        return False
+
+    def merge_directory(self, directory_name: Optional[str] = None) -> List[str]:
+        """合并指定目录或所有子目录的PDF文件"""
+        try:
+            if not os.path.exists(self.pdf_dir):
+                raise FileProcessingError(f"PDF目录不存在: {self.pdf_dir}")
+
+            # 确保输出目录存在
+            os.makedirs(self.final_pdf_dir, exist_ok=True)
+
+            # 域名和时间戳标签在__init__中已预计算
+            domain = self._domain_tag
+            current_date = self._date_tag
+
+            merged_files = []
+
+            if directory_name:
+                # 合并指定目录
+                directory_path = os.path.join(self.pdf_dir, directory_name)
+                if os.path.isdir(directory_path):
+                    # 单引擎模式：正常合并
+                    friendly_filename = self._generate_friendly_filename(directory_name, current_date)
+                    output_path = os.path.join(
+                        self.final_pdf_dir,
+                        friendly_filename
+                    )
+                    if self.merge_pdfs_stream(directory_path, output_path):
+                        merged_files.append(output_path)
+                else:
+                    self.logger.warning(f"指定目录不存在: {directory_path}")
+            else:
+                # 根目录和各子目录的合并相互独立，作为同一批任务并行执行
+                try:
+                    merge_jobs = []
+
+                    # 只有根目录直接放了PDF才值得跑根合并（爬虫通常只往
+                    # 子目录写文件）；根目录任务排在首位，保证merged_files
+                    # 顺序与串行版本一致
+                    if self._has_direct_pdfs(self.pdf_dir):
+                        root_output_path = os.path.join(
+                            self.final_pdf_dir,
+                            f"{domain}_{current_date}.pdf"
+                        )
+                        merge_jobs.append((domain, self.pdf_dir, root_output_path))
+
+                    # 收集需要合并的子目录（scandir的DirEntry自带类型缓存，
+                    # 无需对每个条目单独stat）。循环不变量提前绑定为局部变量
+                    final_pdf_dir = self.final_pdf_dir
+                    skip_names = frozenset(('finalPdf', 'metadata', '.temp'))
+
+                    with os.scandir(self.pdf_dir) as entries:
+                        for entry in entries:
+                            # 跳过非目录和特殊目录
+                            if not entry.is_dir(follow_symlinks=False) or \
+                                    entry.name in skip_names:
+                                self.logger.debug("跳过项目: %s (非目录或特殊目录)", entry.name)
+                                continue
+
+                            output_path = os.path.join(
+                                final_pdf_dir,
+                                f"{entry.name}_{current_date}.pdf"
+                            )
+                            merge_jobs.append((entry.name, entry.path, output_path))
+
+                    if merge_jobs:
+                        # 并发度受config的concurrency限制，避免过多进程导致吞吐下降
+                        max_workers = min(
+                            self.config.get('concurrency', os.cpu_count() or 1),
+                            len(merge_jobs)
+                        )
+
+                        # 工作进程的日志经队列汇聚到父进程的处理器，
+                        # 避免多进程交错写stderr/日志文件
+                        manager = multiprocessing.Manager()
+                        log_queue = manager.Queue(-1)
+                        log_listener = QueueListener(log_queue, *self.logger.handlers)
+                        log_listener.start()
+
+                        try:
+                            with ProcessPoolExecutor(
+                                max_workers=max_workers,
+                                initializer=_init_worker_logging,
+                                initargs=(log_queue,)
+                            ) as executor:
+                                futures = [
+                                    (item, executor.submit(
+                                        _merge_subdirectory_worker,
+                                        self.config_path, item_path, output_path
+                                    ))
+                                    for item, item_path, output_path in merge_jobs
+                                ]
+
+                                # 按提交顺序收集结果，保证merged_files顺序稳定
+                                for item, future in futures:
+                                    try:
+                                        result = future.result()
+                                        if result['success']:
+                                            merged_files.append(result['output_path'])
+
+                                        # 汇总子进程统计
+                                        worker_stats = result['stats']
+                                        self.stats['files_processed'] += worker_stats['files_processed']
+                                        self.stats['total_pages'] += worker_stats['total_pages']
+                                        self.stats['memory_peak'] = max(
+                                            self.stats['memory_peak'],
+                                            worker_stats['memory_peak']
+                                        )
+                                        self.stats['errors'].extend(worker_stats['errors'])
+                                        self.stats['errors_total'] += worker_stats['errors_total']
+
+                                    except Exception as e:
+                                        self.logger.error(f"处理子目录 {item} 时出错: {e}", exc_info=True)
+                                        continue
+                        finally:
+                            log_listener.stop()
+                            manager.shutdown()
+
+                except Exception as e:
+                    self.logger.error(f"列出PDF目录内容时出错: {e}", exc_info=True)
+
+            return merged_files
+
+        except Exception as e:
+            error_msg = f"目录合并失败: {e}"
+            self.logger.error(error_msg, exc_info=True)
+            raise FileProcessingError(error_msg)
+
+    def get_statistics(self) -> Dict[str, Any]:
+        """获取合并统计信息"""
+        elapsed_time = 0
+        if self.stats['start_time']:
+            elapsed_time = time.time() - self.stats['start_time']
+
+        return {
+            'files_processed': self.stats['files_processed'],
+            'total_pages': self.stats['total_pages'],
+            'elapsed_time': elapsed_time,
+            'memory_peak_mb': self.stats['memory_peak'],
+            'errors_count': self.stats['errors_total'],
+            'errors': list(self.stats['errors']),  # 最近10个错误
+            'avg_pages_per_file': (
+                self.stats['total_pages'] / self.stats['files_processed']
+                if self.stats['files_processed'] > 0 else 0
+            ),
+            'processing_speed': (
+                self.stats['files_processed'] / elapsed_time
+                if elapsed_time > 0 else 0
+            )
+        }
+
+    def run(self) -> Dict[str, Any]:
+        """运行PDF合并任务"""
+        self.stats['start_time'] = time.time()
+
+        # 合并循环分配大量短命的PyMuPDF包装对象，默认gen0阈值(700)会
+        # 频繁触发分代回收；引用计数足以回收这些对象，调高阈值可省下
+        # 无谓的回收扫描。freeze把已加载的配置/标题等长命对象移出
+        # gen0扫描范围，任务结束后恢复原状
+        old_gc_threshold = gc.get_threshold()
+        gc.set_threshold(50_000, 10, 10)
+        gc.freeze()
+
+        try:
+            # 执行合并
+            merged_files = self.merge_directory()
+
+            # 获取统计信息
+            stats = self.get_statistics()
+
+            result = {
+                'success': True,
+                'merged_files': merged_files,
+                'statistics': stats
+            }
+
+            # Task completed successfully (detailed stats printed separately)
+
+            return result
+
+        except Exception as e:
+            error_msg = f"PDF合并任务失败: {e}"
+            self.logger.error(error_msg, exc_info=True)
+
+            return {
+                'success': False,
+                'error': error_msg,
+                'statistics': self.get_statistics()
+            }
+
+        finally:
+            gc.set_threshold(*old_gc_threshold)
+            gc.unfreeze()
+
+def main():
+    """主函数，支持命令行执行"""
+    import sys
+    import argparse
+
+    parser = argparse.ArgumentParser(description='Smart PDF Merger Tool')
+    parser.add_argument('--config', default='config.json', help='Configuration file path')
+    parser.add_argument('--directory', help='Specify directory name to merge')
+    parser.add_argument('--verbose', '-v', action='store_true', help='Verbose output')
+
+    args = parser.parse_args()
+
+    # 设置日志级别
+    if args.verbose:
+        logging.basicConfig(level=logging.INFO)
+    else:
+        logging.basicConfig(level=logging.WARNING)
+
+    try:
+        # 创建PDF合并器
+        merger = PDFMerger(config_path=args.config)
+
+        # 执行合并
+        if args.directory:
+            merged_files = merger.merge_directory(args.directory)
+        else:
+            result = merger.run()
+            merged_files = result.get('merged_files', [])
+
+        # Output results  
+        print(f"\n✅ Merge completed! Generated {len(merged_files)} PDF file(s):")
+        for file_path in merged_files:
+            print(f"  📄 {file_path}")
+
+        # Output statistics
+        stats = merger.get_statistics()
+        print(f"\n📊 Statistics:")
+        print(f"  - Files processed: {stats['files_processed']}")
+        print(f"  - Total pages: {stats['total_pages']}")
+        print(f"  - Duration: {stats['elapsed_time']:.1f} seconds")
+        print(f"  - Memory peak: {stats['memory_peak_mb']:.1f} MB")
+
+        if stats['errors_count'] > 0:
+            print(f"  ⚠️  Errors: {stats['errors_count']}")
+
+        return 0
+
+    except Exception as e:
+        print(f"❌ Execution failed: {e}", file=sys.stderr)
+        print(f"Error details: {traceback.format_exc()}", file=sys.stderr)
+        return 1
+
+if __name__ == '__main__':
+    sys.exit(main())